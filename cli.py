@@ -1,13 +1,24 @@
 # cli.py
 import sys
+from itertools import islice, repeat
 
-from parser import parse_sql, SQLParseError
+from parser import SQLParseError
 from engine import QueryEngine, QueryExecutionError
 
+# Approximate size of each block of rows written by print_table
+OUTPUT_CHUNK_SIZE = 64 * 1024
 
-def print_table(columns, rows):
+
+def _column_strings(values):
+    """Return values as strings, reusing the list when it is all str."""
+    if all(map(str.__instancecheck__, values)):
+        return values
+    return ["" if v is None else str(v) for v in values]
+
+
+def print_table(columns, result):
     """
-    Print rows as a simple table:
+    Print a columnar result ({column: values}) as a simple table:
     col1 | col2
     ---- | ----
     v11  | v12
@@ -16,33 +27,44 @@ def print_table(columns, rows):
         print("(no columns)")
         return
 
-    # Convert everything to string for printing
-    str_rows = [
-        ["" if row.get(c) is None else str(row.get(c)) for c in columns]
-        for row in rows
-    ]
+    # Convert to string for printing, column by column. CSV cells are
+    # already str, so a column that holds only strings is used as-is;
+    # only columns with other values (None, numbers) are converted.
+    str_cols = [_column_strings(result[c]) for c in columns]
 
-    # Compute column widths
-    widths = []
-    for i, col in enumerate(columns):
-        max_len = len(col)
-        for r in str_rows:
-            if len(r[i]) > max_len:
-                max_len = len(r[i])
-        widths.append(max_len)
+    # Compute column widths: one C-level max() pass per column
+    widths = [
+        max(len(col), max(map(len, values), default=0))
+        for col, values in zip(columns, str_cols)
+    ]
 
     def format_row(values):
-        return " | ".join(
-            v.ljust(widths[i]) for i, v in enumerate(values)
-        )
+        return " | ".join(map(str.ljust, values, widths))
 
-    # Header
-    print(format_row(columns))
-    print(format_row(["-" * w for w in widths]))
+    # Pad cells column by column so rows are just a join. The maps are
+    # lazy: only the rows of the block being written are padded.
+    padded = [
+        map(str.ljust, values, repeat(w))
+        for values, w in zip(str_cols, widths)
+    ]
 
-    # Rows
-    for r in str_rows:
-        print(format_row(r))
+    # Header, separator, then rows. Output goes straight to
+    # sys.stdout.write in blocks of about OUTPUT_CHUNK_SIZE characters:
+    # one call per block instead of one per line, without building the
+    # whole table as one string for large results.
+    write = sys.stdout.write
+    write(format_row(columns) + "\n")
+    write(format_row(["-" * w for w in widths]) + "\n")
+
+    line_len = sum(widths) + 3 * (len(widths) - 1) + 1
+    rows_per_chunk = max(1, OUTPUT_CHUNK_SIZE // line_len)
+    rows = zip(*padded)
+    while True:
+        lines = list(map(" | ".join, islice(rows, rows_per_chunk)))
+        if not lines:
+            break
+        lines.append("")  # trailing newline
+        write("\n".join(lines))
 
 
 def main():
@@ -81,9 +103,8 @@ def main():
             continue
 
         try:
-            parsed = parse_sql(stripped)
-            columns, rows = engine.execute(parsed)
-            print_table(columns, rows)
+            columns, result = engine.execute_sql(stripped)
+            print_table(columns, result)
         except SQLParseError as e:
             print(f"[Syntax error] {e}")
         except QueryExecutionError as e:
@@ -1,97 +1,157 @@
 # engine.py
 import csv
+import operator
 import os
-from typing import List, Dict, Any
+from dataclasses import dataclass, field, replace
+from itertools import compress, islice, repeat
+from typing import List, Dict, Any, Tuple, Optional, Callable, Iterator, Sequence
+
+from parser import (
+    ParsedQuery,
+    WhereClause,
+    Aggregate,
+    SQLParseError,
+    parse_sql_cached,
+    _templatize,
+)
 
 
 class QueryExecutionError(Exception):
-    """Basic error type for data loading / execution problems."""
+    """Raised for semantic/runtime errors during query execution."""
     pass
 
 
-class Table:
-    """
-    Represents a simple in-memory table loaded from a CSV file.
+# Query result: (column names, {column name: list of values}). Results are
+# columnar like the tables they come from.
+Result = Tuple[List[str], Dict[str, List[Any]]]
 
-    - name: table name (derived from filename without extension)
-    - rows: list of dictionaries, one per row
-    - columns: list of column names
-    """
-
-    def __init__(self, name: str, rows: List[Dict[str, Any]]) -> None:
-        self.name = name
-        self.rows = rows
-        self.columns = list(rows[0].keys()) if rows else []
-
-    @classmethod
-    def from_csv(cls, path: str) -> "Table":
-        """
-        Load a CSV file into a Table.
-
-        Uses csv.DictReader so each row is a dict:
-        {column_name: value_as_string}
-        """
-        if not os.path.exists(path):
-            raise QueryExecutionError(f"CSV file not found: {path}")
+# Number of rows per tile when evaluating chained WHERE conditions
+BATCH = 1024
 
-        base = os.path.basename(path)
-        name, _ = os.path.splitext(base)
+# Equality lookups on a column before an equality index is built for it
+EQ_INDEX_THRESHOLD = 3
 
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
+# Read buffer for CSV files: fewer, larger reads than the 8 KiB default
+READ_BUFFER_SIZE = 1 << 20
 
-        return cls(name=name, rows=rows)
+# WHERE operator -> function implementing it
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
 
+# Static selectivity score per operator, lower = fewer rows expected to
+# match. Used to order chained WHERE conditions.
+_SELECTIVITY = {"=": 0, ">": 2, "<": 2, ">=": 2, "<=": 2, "!=": 3}
 
-if __name__ == "__main__":
-    # Small manual test for step 1.2
-    csv_path = "data/people.csv"  # make sure this path exists
 
+def _take(values: List[Any], row_ids: Optional[Sequence[int]]) -> List[Any]:
+    """
+    Values at row_ids, or the whole list when row_ids is None. A range
+    (a batch of consecutive rows) is taken as a slice.
+    """
+    if row_ids is None:
+        return values
+    if isinstance(row_ids, range):
+        return values[row_ids.start:row_ids.stop]
+    return list(map(values.__getitem__, row_ids))
+
+
+def _numeric_scan(
+    fn: Callable[[Any, Any], bool],
+    cells: List[Any],
+    row_ids: Optional[Sequence[int]],
+    literal: float,
+    value: Any,
+) -> List[bool]:
+    """
+    Fallback for a numeric comparison on a column that is not all
+    numeric (Table.numeric() returned None): converts only the rows in
+    row_ids, so a type mismatch is reported only if a row the query
+    actually tests holds a non-numeric value.
+    """
+    if row_ids is not None:
+        try:
+            return list(map(fn, map(float, _take(cells, row_ids)), repeat(literal)))
+        except ValueError:
+            pass
+    # Every row is tested (or a tested row failed): report the first bad one
+    bad = next(c for c in _take(cells, row_ids) if not _is_number(c))
+    raise QueryExecutionError(
+        f"Type mismatch: cannot compare non-numeric value {bad!r} "
+        f"with numeric literal {value!r}."
+    )
+
+
+def _is_number(cell: Any) -> bool:
     try:
-        table = Table.from_csv(csv_path)
-    except QueryExecutionError as e:
-        print(f"Error: {e}")
-    else:
-        print(f"Loaded table '{table.name}' with columns: {table.columns}")
-        print("First 3 rows:")
-        for row in table.rows[:3]:
-            print(row)
-
-# engine.py
-import csv
-import os
-from typing import List, Dict, Any, Tuple, Optional
-
-from parser import ParsedQuery, WhereClause, Aggregate, SQLParseError, parse_sql
+        float(cell)
+    except ValueError:
+        return False
+    return True
 
 
-class QueryExecutionError(Exception):
-    """Raised for semantic/runtime errors during query execution."""
-    pass
+def _check_literal(op: str, value: Any) -> None:
+    """
+    Check that a WHERE literal can be used with op:
+    - If value is numeric, any operator is allowed.
+    - If value is string, we only allow = and != for safety.
+    """
+    if isinstance(value, str):
+        if op not in ("=", "!="):
+            raise QueryExecutionError(
+                f"String comparisons only support '=' and '!='. "
+                f"Got operator '{op}'."
+            )
+    elif not isinstance(value, (int, float)):
+        raise QueryExecutionError(
+            f"Unsupported WHERE value type: {type(value).__name__}"
+        )
 
 
 class Table:
     """
     Represents a simple in-memory table loaded from a CSV file.
 
+    Data is stored column-wise (structure of arrays) rather than as one
+    dict per row, so scans over a single column never touch the others.
+
     - name: table name (derived from filename without extension)
-    - rows: list of dictionaries, one per row
-    - columns: list of column names
+    - columns: list of column names, in CSV header order
+    - data: one list of values per column, indexed by column id
+    - col_id: {column_name: column id}; names are resolved to ids once,
+      when a query is planned, and execution only uses ids
+    - num_rows: number of rows
     """
 
-    def __init__(self, name: str, rows: List[Dict[str, Any]]) -> None:
+    def __init__(self, name: str, columns: List[str], data: List[List[Any]]) -> None:
         self.name = name
-        self.rows = rows
-        self.columns = list(rows[0].keys()) if rows else []
+        self.columns = columns
+        self.data = data
+        self.col_id: Dict[str, int] = {c: i for i, c in enumerate(columns)}
+        self.num_rows = len(data[0]) if data else 0
+        # column id -> per-row "is not null" flags, built lazily by nonnull()
+        self._nonnull: List[Optional[List[bool]]] = [None] * len(columns)
+        # column id -> values as float (None: not all numeric), see numeric()
+        self._numeric_cache: Dict[int, Optional[List[float]]] = {}
+        # (column id, numeric?) -> equality lookups so far / value -> row ids,
+        # see eq_lookup()
+        self._eq_hits: Dict[Tuple[int, bool], int] = {}
+        self._eq_index: Dict[Tuple[int, bool], Dict[Any, List[int]]] = {}
 
     @classmethod
     def from_csv(cls, path: str) -> "Table":
         """
         Load a CSV file into a Table.
 
-        Uses csv.DictReader so each row is a dict:
-        {column_name: value_as_string}
+        Uses csv.reader and transposes the rows into columns BATCH rows
+        at a time with zip(), so the per-field work happens in C.
+        Values are kept as the strings read from the file; short rows
+        are padded with "" and extra fields are ignored.
         """
         if not os.path.exists(path):
             raise QueryExecutionError(f"CSV file not found: {path}")
@@ -99,11 +159,151 @@ class Table:
         base = os.path.basename(path)
         name, _ = os.path.splitext(base)
 
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
+        with open(path, newline="", encoding="utf-8", buffering=READ_BUFFER_SIZE) as f:
+            reader = csv.reader(f)
+            columns = next(reader, [])
+            data: List[List[Any]] = [[] for _ in columns]
+            width = len(columns)
+
+            while True:
+                raw = list(islice(reader, BATCH))
+                if not raw:
+                    break
+                # csv.DictReader semantics: blank lines are skipped
+                chunk = [r for r in raw if r]
+                if not chunk:
+                    continue
+                if any(map(width.__ne__, map(len, chunk))):
+                    # zip() stops at the shortest row: even them out
+                    chunk = [(r + [""] * (width - len(r)))[:width] for r in chunk]
+                for values, col in zip(data, zip(*chunk)):
+                    values.extend(col)
+
+        return cls(name=name, columns=columns, data=data)
+
+    def nonnull(self, col_id: int) -> List[bool]:
+        """
+        Return one flag per row telling whether the value in column col_id
+        is non-null (not None and not ""). Computed on first use and cached.
+        """
+        flags = self._nonnull[col_id]
+        if flags is None:
+            flags = self._nonnull[col_id] = list(map(bool, self.data[col_id]))
+        return flags
 
-        return cls(name=name, rows=rows)
+    def numeric(self, col_id: int) -> Optional[List[float]]:
+        """
+        Return column col_id converted to float, or None if some value in
+        it is not a number. Computed on first use and cached, so repeated
+        numeric filters on a column parse its strings only once.
+        """
+        if col_id not in self._numeric_cache:
+            try:
+                values: Optional[List[float]] = list(map(float, self.data[col_id]))
+            except ValueError:
+                values = None
+            self._numeric_cache[col_id] = values
+        return self._numeric_cache[col_id]
+
+    def eq_lookup(self, col_id: int, key: Any, numeric: bool) -> Optional[List[int]]:
+        """
+        Return the indices of the rows whose value in column col_id equals
+        key, using an equality index, or None if the column has no index.
+
+        Lookups are counted per column; once a column has been looked up
+        EQ_INDEX_THRESHOLD times, an index {value: row ids} is built over
+        its raw values (numeric=False) or its float values (numeric=True).
+        The returned list belongs to the index and must not be modified.
+        """
+        k = (col_id, numeric)
+        index = self._eq_index.get(k)
+        if index is None:
+            hits = self._eq_hits[k] = self._eq_hits.get(k, 0) + 1
+            if hits < EQ_INDEX_THRESHOLD:
+                return None
+            values = self.numeric(col_id) if numeric else self.data[col_id]
+            if values is None:
+                return None  # not all numeric: no index on float values
+            index = self._eq_index[k] = {}
+            for i, v in enumerate(values):
+                index.setdefault(v, []).append(i)
+        return index.get(key, [])
+
+
+class Condition:
+    """
+    A WHERE condition compiled against a table by QueryEngine._compile_where.
+
+    Column, operator and literal type are resolved once; mask() then runs
+    the operator over the column with map(), with no per-row dispatch.
+    - Numeric literals are compared as float with the column's floats.
+    - String literals are compared with the raw column values.
+    """
+
+    def __init__(self, table: Table, col_id: int, op: str, value: Any) -> None:
+        self.table = table
+        self.col_id = col_id
+        self.op = op
+        self.fn = _OPS[op]
+        self.value = value
+        self.numeric = isinstance(value, (int, float))
+        self.literal = float(value) if self.numeric else value
+
+    def mask(self, row_ids: Optional[Sequence[int]] = None) -> Iterator[bool]:
+        """Return one bool per row in row_ids (None = every row)."""
+        cells = self.table.data[self.col_id]
+        if not self.numeric:
+            return map(self.fn, _take(cells, row_ids), repeat(self.literal))
+
+        numbers = self.table.numeric(self.col_id)
+        if numbers is None:
+            # Not every value is numeric: convert just the requested rows,
+            # so a mismatch is only reported for rows we test.
+            return iter(_numeric_scan(self.fn, cells, row_ids, self.literal, self.value))
+        return map(self.fn, _take(numbers, row_ids), repeat(self.literal))
+
+    def lookup(self) -> Optional[List[int]]:
+        """
+        Return the indices of all matching rows from the table's equality
+        index, or None if this is not an equality or there is no index
+        (yet) and the caller has to scan. The list must not be modified.
+        """
+        if self.op != "=":
+            return None
+        return self.table.eq_lookup(self.col_id, self.literal, self.numeric)
+
+
+@dataclass
+class CompiledPlan:
+    """
+    A ParsedQuery resolved against a loaded table: WHERE conditions
+    compiled and ordered, column names resolved to column ids. A plan can
+    be executed any number of times while the loaded tables stay the same,
+    and with other WHERE literals through bind().
+    """
+    table: Table
+    preds: List[Condition]
+    combinator: str
+    aggregate: Optional[Aggregate] = None
+    columns: List[str] = field(default_factory=list)  # output column names
+    col_ids: List[int] = field(default_factory=list)  # projected / counted columns
+    literals: Tuple[Any, ...] = ()                     # WHERE literals, in query order
+    slots: List[int] = field(default_factory=list)     # index in literals of each pred
+
+    def bind(self, literals: Tuple[Any, ...]) -> "CompiledPlan":
+        """
+        Return this plan with its WHERE literals replaced by literals
+        (in query order). Each literal is checked against its operator
+        again, since a string may now stand where a number was.
+        """
+        if literals == self.literals:
+            return self
+        preds = []
+        for pred, slot in zip(self.preds, self.slots):
+            value = literals[slot]
+            _check_literal(pred.op, value)
+            preds.append(Condition(self.table, pred.col_id, pred.op, value))
+        return replace(self, preds=preds, literals=literals)
 
 
 class QueryEngine:
@@ -112,33 +312,105 @@ class QueryEngine:
     For now we support a single table at a time.
     """
 
+    PLAN_CACHE_SIZE = 256
+
     def __init__(self) -> None:
         self.tables: Dict[str, Table] = {}
+        # Bumped whenever the loaded tables change; part of the plan
+        # cache key so plans compiled against old tables are never reused.
+        self.schema_version = 0
+        # (query template, schema_version) -> plan, see execute_sql()
+        self._plan_cache: Dict[Tuple[str, int], CompiledPlan] = {}
 
     def load_table_from_csv(self, path: str) -> Table:
         table = Table.from_csv(path)
         self.tables[table.name] = table
+        self.schema_version += 1
+        # Cached plans hold their Table (and its caches): drop them so a
+        # replaced table is not kept alive by stale plans
+        self._plan_cache.clear()
         return table
 
-    def execute(self, query: ParsedQuery) -> Tuple[List[str], List[Dict[str, Any]]]:
+    def execute(self, query: ParsedQuery) -> Result:
         """
         Execute a ParsedQuery.
 
         Returns:
-            (columns, rows)
-        where rows is a list of dictionaries with those columns as keys.
+            (columns, result)
+        where result maps each of those columns to its list of values.
         """
+        return self._run(self.plan(query))
+
+    def execute_sql(self, sql: str) -> Result:
+        """
+        Parse, plan and execute a SQL string, reusing the cached plan when
+        a query differing at most in its WHERE literals was already run
+        against the current tables. Plans are cached by query template
+        (see parser._templatize) and the literals of this query are bound
+        into the cached plan. Loading a table drops all cached plans.
+        """
+        template, literals = _templatize(sql)
+        key = (template, self.schema_version)
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            plan = self.plan(parse_sql_cached(sql))
+            if len(self._plan_cache) >= self.PLAN_CACHE_SIZE:
+                # evict the oldest entry (dicts keep insertion order)
+                del self._plan_cache[next(iter(self._plan_cache))]
+            self._plan_cache[key] = plan
+        return self._run(plan.bind(literals))
+
+    def plan(self, query: ParsedQuery) -> CompiledPlan:
+        """Resolve a ParsedQuery against the loaded tables."""
         table = self._get_table(query.table)
+        combinator = query.where_combinator
 
-        # 1. Apply WHERE filtering
-        filtered_rows = self._apply_where(table, query.where)
+        # Compile WHERE conditions, in evaluation order
+        preds, slots = self._plan_where(table, query.where, combinator)
+        literals = tuple(w.value for w in query.where)
 
-        # 2. Aggregation (if any)
         if query.aggregate is not None:
-            return self._execute_aggregate(query.aggregate, filtered_rows)
+            aggregate = query.aggregate
+            col_ids = self._resolve_aggregate(table, aggregate)
+            return CompiledPlan(
+                table,
+                preds,
+                combinator,
+                aggregate=aggregate,
+                columns=[f"COUNT({aggregate.arg})"],
+                col_ids=col_ids,
+                literals=literals,
+                slots=slots,
+            )
+
+        columns = self._resolve_projection(table, query.select_columns)
+        col_ids = [table.col_id[c] for c in columns]
+        return CompiledPlan(
+            table,
+            preds,
+            combinator,
+            columns=columns,
+            col_ids=col_ids,
+            literals=literals,
+            slots=slots,
+        )
+
+    def _run(self, plan: CompiledPlan) -> Result:
+        table = plan.table
+
+        # 1. Aggregation (if any). COUNT only needs how many rows match,
+        #    so it does not go through the row indices below.
+        if plan.aggregate is not None:
+            return self._execute_aggregate(plan)
+
+        # 2. Apply WHERE filtering -> indices of matching rows
+        #    (None: no WHERE clause, every row)
+        row_ids = None
+        if plan.preds:
+            row_ids = self._apply_where(table, plan.preds, plan.combinator)
 
         # 3. Projection (SELECT columns)
-        return self._execute_projection(query.select_columns, filtered_rows)
+        return self._execute_projection(table, plan.columns, plan.col_ids, row_ids)
 
     # ---------- helpers ----------
 
@@ -150,16 +422,90 @@ class QueryEngine:
             )
         return self.tables[name]
 
+    def _plan_where(
+        self,
+        table: Table,
+        where: Sequence[WhereClause],
+        combinator: str,
+    ) -> Tuple[List[Condition], List[int]]:
+        """
+        Compile the WHERE conditions and order them so that chains
+        short-circuit early: with AND the most selective condition runs
+        first, with OR the least selective one (it leaves the fewest rows
+        for the conditions after it).
+        Returns (conditions, position of each condition in where).
+        """
+        order = sorted(
+            range(len(where)),
+            key=lambda i: _SELECTIVITY.get(where[i].operator, 3),
+            reverse=(combinator == "OR"),
+        )
+        return [self._compile_where(table, where[i]) for i in order], order
+
     def _apply_where(
         self,
         table: Table,
-        where: Optional[WhereClause],
-    ) -> List[Dict[str, Any]]:
-        if where is None:
-            return table.rows
+        preds: List[Condition],
+        combinator: str,
+    ) -> List[int]:
+        """
+        Return the indices of the rows that satisfy the WHERE clause.
 
+        A single condition streams over the whole column. Chained
+        conditions are evaluated one tile of BATCH rows at a time: every
+        condition runs on a tile before moving to the next one, so the
+        intermediate row lists stay small and each tile short-circuits
+        on its own.
+        """
+        n = table.num_rows
+        if not preds:
+            return list(range(n))
+        if len(preds) == 1:
+            row_ids = preds[0].lookup()
+            if row_ids is not None:
+                return list(row_ids)
+            return list(compress(range(n), preds[0].mask()))
+
+        filter_batch = self._and_batch if combinator == "AND" else self._or_batch
+        result: List[int] = []
+        for start in range(0, n, BATCH):
+            result.extend(filter_batch(preds, range(start, min(start + BATCH, n))))
+        return result
+
+    @staticmethod
+    def _and_batch(preds: List[Condition], batch: range) -> Sequence[int]:
+        # Each condition only looks at the rows that passed the previous
+        # ones; stop as soon as none are left.
+        row_ids: Sequence[int] = batch
+        for pred in preds:
+            row_ids = list(compress(row_ids, pred.mask(row_ids)))
+            if not row_ids:
+                break
+        return row_ids
+
+    @staticmethod
+    def _or_batch(preds: List[Condition], batch: range) -> List[int]:
+        # Each condition only looks at the rows not matched yet; stop as
+        # soon as every row matched.
+        matched: List[int] = []
+        remaining: Sequence[int] = batch
+        for pred in preds:
+            mask = list(pred.mask(remaining))
+            matched.extend(compress(remaining, mask))
+            remaining = list(compress(remaining, map(operator.not_, mask)))
+            if not remaining:
+                break
+        matched.sort()
+        return matched
+
+    def _compile_where(self, table: Table, where: WhereClause) -> Condition:
+        """
+        Specialize a WHERE clause for a table: check the column, operator
+        and literal type once and resolve them into a Condition.
+        """
         col = where.column
-        if col not in table.columns:
+        col_id = table.col_id.get(col)
+        if col_id is None:
             raise QueryExecutionError(
                 f"Column '{col}' in WHERE clause does not exist. "
                 f"Available columns: {', '.join(table.columns)}."
@@ -167,145 +513,131 @@ class QueryEngine:
 
         op = where.operator
         value = where.value
-        result = []
-
-        for row in table.rows:
-            cell = row.get(col)
-            if self._compare(cell, op, value):
-                result.append(row)
-
-        return result
-
-    def _compare(self, cell: Any, op: str, value: Any) -> bool:
-        """
-        Compare cell (a string from CSV) with value (parsed literal).
-        - If value is numeric, we try to treat cell as numeric.
-        - If value is string, we only allow = and != for safety.
-        """
-        if cell is None:
-            cell_str = ""
-        else:
-            cell_str = str(cell)
-
-        # Numeric comparison
-        if isinstance(value, (int, float)):
-            try:
-                cell_num = float(cell_str)
-            except ValueError:
-                raise QueryExecutionError(
-                    f"Type mismatch: cannot compare non-numeric value {cell!r} "
-                    f"with numeric literal {value!r}."
-                )
-            return self._apply_operator(cell_num, op, value)
+        if op not in _OPS:
+            raise QueryExecutionError(f"Unknown operator: {op}")
+        _check_literal(op, value)
 
-        # String comparison
-        if isinstance(value, str):
-            if op not in ("=", "!="):
-                raise QueryExecutionError(
-                    f"String comparisons only support '=' and '!='. "
-                    f"Got operator '{op}'."
-                )
-            return self._apply_operator(cell_str, op, value)
-
-        raise QueryExecutionError(
-            f"Unsupported WHERE value type: {type(value).__name__}"
-        )
+        return Condition(table, col_id, op, value)
 
     @staticmethod
-    def _apply_operator(left: Any, op: str, right: Any) -> bool:
-        if op == "=":
-            return left == right
-        if op == "!=":
-            return left != right
-        if op == ">":
-            return left > right
-        if op == "<":
-            return left < right
-        if op == ">=":
-            return left >= right
-        if op == "<=":
-            return left <= right
-        raise QueryExecutionError(f"Unknown operator: {op}")
-
-    def _execute_aggregate(
-        self,
-        aggregate: Aggregate,
-        rows: List[Dict[str, Any]],
-    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+    def _resolve_aggregate(table: Table, aggregate: Aggregate) -> List[int]:
+        """Check the aggregate; return [column id] for COUNT(col), [] for COUNT(*)."""
         if aggregate.func.upper() != "COUNT":
             raise QueryExecutionError(f"Unsupported aggregate function: {aggregate.func}")
 
         arg = aggregate.arg
         if arg == "*":
-            count = len(rows)
-        else:
-            # COUNT(column): count non-null (non-empty) values
-            count = 0
-            for row in rows:
-                v = row.get(arg)
-                if v not in (None, ""):
-                    count += 1
-
-        col_name = f"COUNT({arg})"
-        return [col_name], [{col_name: count}]
+            return []
+        if arg not in table.col_id:
+            raise QueryExecutionError(
+                f"Column '{arg}' in COUNT does not exist. "
+                f"Available columns: {', '.join(table.columns)}."
+            )
+        return [table.col_id[arg]]
 
-    def _execute_projection(
+    def _execute_aggregate(
         self,
-        select_columns: List[str],
-        rows: List[Dict[str, Any]],
-    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        plan: CompiledPlan,
+    ) -> Result:
+        col_id = plan.col_ids[0] if plan.col_ids else None  # None: COUNT(*)
+        count = self._count_with_where(plan.table, plan.preds, plan.combinator, col_id)
+
+        col_name = plan.columns[0]
+        return [col_name], {col_name: [count]}
+
+    def _count_with_where(
+        self,
+        table: Table,
+        preds: List[Condition],
+        combinator: str,
+        col_id: Optional[int],
+    ) -> int:
+        """
+        COUNT(*) (col_id is None) / COUNT(column) over the rows matching
+        the WHERE clause.
+        A single condition is counted from the equality index when there
+        is one, otherwise by summing its boolean mask without materializing
+        the matching rows; chained conditions go through _apply_where so
+        they keep their short-circuiting.
+        """
+        mask = None
+        row_ids = None
+        if len(preds) == 1:
+            row_ids = preds[0].lookup()
+            if row_ids is None:
+                mask = preds[0].mask()
+        elif preds:
+            row_ids = self._apply_where(table, preds, combinator)
+
+        if col_id is None:
+            if mask is not None:
+                return sum(mask)
+            return table.num_rows if row_ids is None else len(row_ids)
+
+        # COUNT(column): count non-null (non-empty) values by counting
+        # the True flags selected by the mask
+        nonnull = table.nonnull(col_id)
+        if mask is not None:
+            return sum(compress(nonnull, mask))
+        if row_ids is not None:
+            return sum(map(nonnull.__getitem__, row_ids))
+        return nonnull.count(True)
+
+    @staticmethod
+    def _resolve_projection(table: Table, select_columns: Sequence[str]) -> List[str]:
+        """Expand SELECT * and check that the selected columns exist."""
         if not select_columns:
             raise QueryExecutionError("No columns specified in SELECT clause.")
 
         # SELECT * → all columns
-        if select_columns == ["*"]:
-            if not rows:
-                # no rows but we still need columns; infer from table?
-                return [], []
-            cols = list(rows[0].keys())
-            projected = [{c: r.get(c) for c in cols} for r in rows]
-            return cols, projected
-
-        # Specific columns
-        cols = select_columns
-
-        if rows:
-            available = set(rows[0].keys())
-            for c in cols:
-                if c not in available:
-                    raise QueryExecutionError(
-                        f"Column '{c}' in SELECT does not exist. "
-                        f"Available columns: {', '.join(sorted(available))}."
-                    )
-
-        projected_rows = []
-        for row in rows:
-            projected_rows.append({c: row.get(c) for c in cols})
-
-        return cols, projected_rows
-
-
-def _print_result(columns: List[str], rows: List[Dict[str, Any]]) -> None:
+        if select_columns == ("*",):
+            return list(table.columns)
+
+        for c in select_columns:
+            if c not in table.col_id:
+                raise QueryExecutionError(
+                    f"Column '{c}' in SELECT does not exist. "
+                    f"Available columns: {', '.join(sorted(table.columns))}."
+                )
+        return list(select_columns)
+
+    def _execute_projection(
+        self,
+        table: Table,
+        cols: List[str],
+        col_ids: List[int],
+        row_ids: Optional[List[int]],
+    ) -> Result:
+        # Each selected column is gathered on its own; no per-row objects
+        result = {}
+        for c, i in zip(cols, col_ids):
+            values = table.data[i]
+            result[c] = values[:] if row_ids is None else _take(values, row_ids)
+
+        return cols, result
+
+
+def _print_result(columns: List[str], result: Dict[str, List[Any]]) -> None:
     """
-    Simple helper for manual testing: prints rows as a table.
+    Simple helper for manual testing: prints a columnar result as a table.
     """
     if not columns:
         print("(no columns)")
         return
 
-    # Convert all values to strings
-    str_rows = [
-        ["" if row.get(c) is None else str(row.get(c)) for c in columns]
-        for row in rows
+    # Convert all values to strings, column by column
+    str_cols = [
+        ["" if v is None else str(v) for v in result[c]]
+        for c in columns
     ]
 
     # Column widths
     widths = []
     for i, col in enumerate(columns):
         max_len = len(col)
-        for r in str_rows:
-            if len(r[i]) > max_len:
-                max_len = len(r[i])
+        for v in str_cols[i]:
+            if len(v) > max_len:
+                max_len = len(v)
         widths.append(max_len)
 
     def fmt(vals):
@@ -315,7 +647,7 @@ def _print_result(columns: List[str], rows: List[Dict[str, Any]]) -> None:
     print(fmt(columns))
     print(fmt(["-" * w for w in widths]))
     # Rows
-    for r in str_rows:
+    for r in zip(*str_cols):
         print(fmt(r))
 
 
@@ -343,9 +675,8 @@ if __name__ == "__main__":
     for sql in test_queries:
         print("SQL:", sql)
         try:
-            parsed = parse_sql(sql)
-            cols, rows = engine.execute(parsed)
-            _print_result(cols, rows)
+            cols, result = engine.execute_sql(sql)
+            _print_result(cols, result)
         except (SQLParseError, QueryExecutionError) as e:
             print("Error:", e)
         print()
@@ -1,7 +1,8 @@
 # parser.py
 import re
+from functools import lru_cache
 from dataclasses import dataclass
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple
 
 
 class SQLParseError(Exception):
@@ -9,25 +10,26 @@ class SQLParseError(Exception):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WhereClause:
     column: str
     operator: str
     value: Any  # str, int, float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Aggregate:
     func: str  # currently only "COUNT"
     arg: str   # "*" or column name
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParsedQuery:
     table: str
-    select_columns: List[str]              # empty if aggregate-only
+    select_columns: Tuple[str, ...]        # empty if aggregate-only
     aggregate: Optional[Aggregate] = None  # None if not aggregate
-    where: Optional[WhereClause] = None
+    where: Tuple[WhereClause, ...] = ()    # empty if no WHERE
+    where_combinator: str = "AND"          # "AND" or "OR", joins the conditions
 
 
 # Main SELECT pattern:
@@ -42,13 +44,41 @@ SELECT_PATTERN = re.compile(
     re.IGNORECASE | re.VERBOSE,
 )
 
+# Aggregate in the SELECT list: COUNT(*) or COUNT(col)
+AGG_PATTERN = re.compile(
+    r"^COUNT\s*\(\s*(?P<arg>\*|[A-Za-z_][A-Za-z0-9_]*)\s*\)$",
+    re.IGNORECASE,
+)
+
+# Single WHERE condition: <col> <op> <value>
+WHERE_PATTERN = re.compile(
+    r"""
+    ^\s*
+    (?P<col>[A-Za-z_][A-Za-z0-9_]*)
+    \s*
+    (?P<op>=|!=|>=|<=|>|<)
+    \s*
+    (?P<val>.+?)
+    \s*$
+    """,
+    re.VERBOSE,
+)
+
+# Splits a WHERE clause on AND / OR. Quoted strings are matched first so
+# that the keywords inside literals are left alone.
+CONDITION_SPLIT_PATTERN = re.compile(
+    r"""('[^']*'|"[^"]*")|\s+(AND|OR)\s+""",
+    re.IGNORECASE,
+)
+
 
 def parse_sql(sql: str) -> ParsedQuery:
     """
     Parse a simple SQL query into a ParsedQuery object.
 
     Supported form:
-        SELECT <columns or COUNT(...)> FROM <table> [WHERE <col> <op> <value>];
+        SELECT <columns or COUNT(...)> FROM <table>
+            [WHERE <col> <op> <value> [AND|OR <col> <op> <value> ...]];
     """
     match = SELECT_PATTERN.match(sql)
     if not match:
@@ -57,14 +87,14 @@ def parse_sql(sql: str) -> ParsedQuery:
     select_part = match.group("select").strip()
     table = match.group("table").strip()
     where_part = match.group("where")
-    where_clause = _parse_where(where_part) if where_part else None
+    where_clause, combinator = _parse_conditions(where_part) if where_part else ((), "AND")
 
     # SELECT can be:
     #  - COUNT(*)
     #  - COUNT(col)
     #  - *
     #  - col1, col2, ...
-    select_columns: List[str] = []
+    select_columns: Tuple[str, ...] = ()
     aggregate: Optional[Aggregate] = None
 
     # Try aggregate first
@@ -74,37 +104,85 @@ def parse_sql(sql: str) -> ParsedQuery:
         # We do NOT support mixing aggregates and normal columns
         return ParsedQuery(
             table=table,
-            select_columns=[],
+            select_columns=(),
             aggregate=aggregate,
             where=where_clause,
+            where_combinator=combinator,
         )
 
     # Not aggregate: parse columns
     if select_part == "*":
-        select_columns = ["*"]
+        select_columns = ("*",)
     else:
         parts = [p.strip() for p in select_part.split(",")]
         if not parts or any(not p for p in parts):
             raise SQLParseError("Invalid column list in SELECT clause.")
-        select_columns = parts
+        select_columns = tuple(parts)
 
     return ParsedQuery(
         table=table,
         select_columns=select_columns,
         aggregate=None,
         where=where_clause,
+        where_combinator=combinator,
     )
 
 
+@lru_cache(maxsize=256)
+def parse_sql_cached(sql: str) -> ParsedQuery:
+    """
+    parse_sql with an LRU cache keyed by the SQL text, for callers that
+    see the same query repeatedly (e.g. the REPL). ParsedQuery is
+    frozen, so sharing the cached instance between callers is safe.
+    """
+    return parse_sql(sql.strip())
+
+
+@lru_cache(maxsize=256)
+def _templatize(sql: str) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Split a SQL string into a template, with each WHERE literal replaced
+    by ?, and the tuple of those literals (parsed, in WHERE order), e.g.
+        "SELECT * FROM t WHERE a = 'x';" -> ("SELECT * FROM t WHERE a = ?;", ("x",))
+    Queries that differ only in their literals share one template. SQL
+    that does not match the grammar is returned unchanged, with no
+    literals; an invalid literal raises SQLParseError as in parse_sql.
+    Cached like parse_sql_cached, so repeated queries skip the regexes.
+    """
+    match = SELECT_PATTERN.match(sql)
+    if not match or match.group("where") is None:
+        return sql, ()
+
+    # Offsets of each condition in sql, split like _parse_conditions
+    spans = []
+    start, end = match.span("where")
+    for m in CONDITION_SPLIT_PATTERN.finditer(sql, start, end):
+        if m.group(2) is None:
+            continue  # quoted literal
+        spans.append((start, m.start()))
+        start = m.end()
+    spans.append((start, end))
+
+    pieces: List[str] = []
+    literals: List[Any] = []
+    pos = 0
+    for start, end in spans:
+        cond = WHERE_PATTERN.match(sql[start:end])
+        if not cond:
+            return sql, ()
+        literals.append(_parse_value(cond.group("val")))
+        pieces.append(sql[pos:start + cond.start("val")])
+        pieces.append("?")
+        pos = start + cond.end("val")
+    pieces.append(sql[pos:])
+    return "".join(pieces), tuple(literals)
+
+
 def _parse_aggregate(select_part: str) -> Optional[Aggregate]:
     """
     Parse COUNT(*) or COUNT(col). Return Aggregate or None if not aggregate.
     """
-    agg_pattern = re.compile(
-        r"^COUNT\s*\(\s*(?P<arg>\*|[A-Za-z_][A-Za-z0-9_]*)\s*\)$",
-        re.IGNORECASE,
-    )
-    m = agg_pattern.match(select_part)
+    m = AGG_PATTERN.match(select_part)
     if not m:
         return None
 
@@ -112,6 +190,32 @@ def _parse_aggregate(select_part: str) -> Optional[Aggregate]:
     return Aggregate(func="COUNT", arg=arg)
 
 
+def _parse_conditions(where_part: str) -> Tuple[Tuple[WhereClause, ...], str]:
+    """
+    Parse a WHERE clause made of one or more conditions joined by AND or
+    OR. Mixing AND and OR in the same clause is not supported.
+    Returns (conditions, combinator).
+    """
+    parts: List[str] = []
+    combinators = set()
+    start = 0
+    for m in CONDITION_SPLIT_PATTERN.finditer(where_part):
+        if m.group(2) is None:
+            continue  # quoted literal
+        parts.append(where_part[start:m.start()])
+        combinators.add(m.group(2).upper())
+        start = m.end()
+    parts.append(where_part[start:])
+
+    if len(combinators) > 1:
+        raise SQLParseError(
+            "Mixing AND and OR in one WHERE clause is not supported."
+        )
+
+    combinator = combinators.pop() if combinators else "AND"
+    return tuple(_parse_where(p) for p in parts), combinator
+
+
 def _parse_where(where_part: str) -> WhereClause:
     """
     Parse WHERE like: column op value
@@ -120,19 +224,7 @@ def _parse_where(where_part: str) -> WhereClause:
       - string: 'text' or "text"
       - number: int or float
     """
-    where_pattern = re.compile(
-        r"""
-        ^\s*
-        (?P<col>[A-Za-z_][A-Za-z0-9_]*)
-        \s*
-        (?P<op>=|!=|>=|<=|>|<)
-        \s*
-        (?P<val>.+?)
-        \s*$
-        """,
-        re.VERBOSE,
-    )
-    m = where_pattern.match(where_part)
+    m = WHERE_PATTERN.match(where_part)
     if not m:
         raise SQLParseError(
             "Could not parse WHERE clause. Expected: column OP value "
@@ -186,6 +278,7 @@ if __name__ == "__main__":
         "SELECT COUNT(*) FROM people;",
         "SELECT COUNT(age) FROM people WHERE country = 'USA';",
         "SELECT name FROM people WHERE age > 30;",
+        "SELECT name FROM people WHERE age > 30 AND country = 'USA';",
     ]
 
     for sql in tests: